@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from api.serializers import IngredientSerializer, TagSerialiser
+from django.conf import settings
+from recipe.models import Ingredient, Tag
+from recipe.transactions import on_commit_batch
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CATALOGS = {
+    'ingredients': (Ingredient, IngredientSerializer),
+    'tags': (Tag, TagSerialiser),
+}
+KEEP_VERSIONS = 2
+MANIFEST = 'manifest.json'
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', ('version', 'content'))
+_snapshots = {}
+_manifest = {}
+
+
+def _write(path, content):
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def _cleanup(name):
+    versions = sorted(
+        (entry for entry in os.scandir(settings.CATALOG_ROOT)
+         if entry.name.startswith(f'{name}.')
+         and entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    for entry in versions[KEEP_VERSIONS:]:
+        for suffix in ('', '.gz', '.br'):
+            if os.path.exists(entry.path + suffix):
+                os.remove(entry.path + suffix)
+
+
+def render_catalog(name):
+    model, serializer = CATALOGS[name]
+    content = json.dumps(
+        serializer(model.objects.order_by('id'), many=True).data,
+        ensure_ascii=False, separators=(',', ':')
+    ).encode()
+    return CatalogSnapshot(hashlib.sha256(content).hexdigest()[:16], content)
+
+
+def publish_catalog(name):
+    version, content = render_catalog(name)
+    filename = f'{name}.{version}.json'
+    path = os.path.join(settings.CATALOG_ROOT, filename)
+    if not os.path.exists(path):
+        _write(path + '.gz', gzip.compress(content, 9))
+        if brotli is not None:
+            _write(path + '.br', brotli.compress(
+                content, mode=brotli.MODE_TEXT, quality=11
+            ))
+        _write(path, content)
+    os.utime(path)
+    _cleanup(name)
+    return {'version': version, 'url': settings.CATALOG_URL + filename}
+
+
+def publish_catalogs():
+    os.makedirs(settings.CATALOG_ROOT, exist_ok=True)
+    manifest = {name: publish_catalog(name) for name in CATALOGS}
+    _write(os.path.join(settings.CATALOG_ROOT, MANIFEST),
+           json.dumps(manifest).encode())
+    return manifest
+
+
+def schedule_publish():
+    on_commit_batch('catalogs', lambda names: publish_catalogs())
+
+
+def get_manifest():
+    path = os.path.join(settings.CATALOG_ROOT, MANIFEST)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    stamp = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+    cached = _manifest.get('current')
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    _manifest['current'] = (stamp, manifest)
+    return manifest
+
+
+def load_snapshots():
+    for name in CATALOGS:
+        _snapshots[name] = render_catalog(name)
+    return _snapshots
+
+
+def get_snapshot(name, version):
+    snapshot = _snapshots.get(name)
+    if snapshot is None or snapshot.version != version:
+        snapshot = render_catalog(name)
+        _snapshots[name] = snapshot
+    return snapshot
@@ -0,0 +1,94 @@
+from api.querysets import get_user_flags
+from api.serializers import RecipeDocumentSerializer, RecipeSparseSerializer
+from django.db import transaction
+from recipe.models import Change, Recipe, RecipeDocument
+from recipe.sync import record_changes
+
+BATCH_SIZE = 500
+
+
+def render_documents(recipe_ids):
+    recipes = Recipe.objects.filter(id__in=recipe_ids).select_related(
+        'author'
+    ).prefetch_related('tags', 'ingredientrecipes__ingredient')
+    documents = [
+        RecipeDocument(recipe=recipe,
+                       data=RecipeDocumentSerializer(recipe).data)
+        for recipe in recipes
+    ]
+    with transaction.atomic():
+        RecipeDocument.objects.filter(recipe_id__in=recipe_ids).delete()
+        RecipeDocument.objects.bulk_create(documents)
+    return {document.recipe_id: document.data for document in documents}
+
+
+def render_all_documents(recipe_ids, batch_size=BATCH_SIZE):
+    recipe_ids = list(recipe_ids)
+    for start in range(0, len(recipe_ids), batch_size):
+        render_documents(recipe_ids[start:start + batch_size])
+
+
+def render_changed_documents(queryset):
+    recipe_ids = list(queryset.values_list('id', flat=True))
+    render_all_documents(recipe_ids)
+    record_changes(Change.RECIPE, recipe_ids)
+
+
+def schedule_render(queryset):
+    transaction.on_commit(lambda: render_changed_documents(queryset))
+
+
+def get_documents(recipes, request):
+    documents = {}
+    for recipe in recipes:
+        try:
+            documents[recipe.id] = recipe.document.data
+        except RecipeDocument.DoesNotExist:
+            pass
+    missing = [recipe.id for recipe in recipes if recipe.id not in documents]
+    if missing:
+        documents.update(render_documents(missing))
+    return personalize(
+        [documents[recipe.id] for recipe in recipes if recipe.id in documents],
+        request
+    )
+
+
+def personalize(documents, request):
+    favorites, carts, follows = get_user_flags(
+        request.user,
+        [document['id'] for document in documents],
+        {document['author']['id'] for document in documents}
+    )
+    return [{
+        'id': document['id'],
+        'tags': document['tags'],
+        'author': {
+            **document['author'],
+            'is_subscribed': document['author']['id'] in follows,
+        },
+        'ingredients': document['ingredients'],
+        'is_favorited': document['id'] in favorites,
+        'is_in_shopping_cart': document['id'] in carts,
+        'name': document['name'],
+        'image': (request.build_absolute_uri(document['image'])
+                  if document['image'] else None),
+        'text': document['text'],
+        'cooking_time': document['cooking_time'],
+    } for document in documents]
+
+
+def get_sparse_documents(recipes, request, fields, expand):
+    recipes = list(recipes)
+    recipe_ids = author_ids = ()
+    if {'is_favorited', 'is_in_shopping_cart'} & fields:
+        recipe_ids = [recipe.id for recipe in recipes]
+    if 'author' in expand:
+        author_ids = {recipe.author_id for recipe in recipes}
+    favorites, carts, follows = get_user_flags(
+        request.user, recipe_ids, author_ids
+    )
+    return RecipeSparseSerializer(recipes, many=True, context={
+        'request': request, 'fields': fields, 'expand': expand,
+        'favorites': favorites, 'carts': carts, 'follows': follows,
+    }).data
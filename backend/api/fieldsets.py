@@ -0,0 +1,29 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_names(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_fieldsets(request, fields, relations):
+    requested = parse_names(request.query_params.get('fields'))
+    expand = parse_names(request.query_params.get('expand'))
+    errors = {}
+    if requested is not None and not requested.issubset(fields):
+        errors['fields'] = (
+            f'Неизвестные поля: {", ".join(sorted(requested - set(fields)))}'
+        )
+    if expand is not None and not expand.issubset(relations):
+        errors['expand'] = (
+            f'Нельзя раскрыть: {", ".join(sorted(expand - set(relations)))}'
+        )
+    if errors:
+        raise ValidationError(errors)
+    if requested is None and expand is None:
+        return None, set(relations)
+    expand = expand or set()
+    if requested is None:
+        return set(fields), expand
+    return requested | expand | {'id'}, expand
@@ -1,12 +1,31 @@
+from django.db.models import Exists, F, OuterRef
 from django_filters.rest_framework import FilterSet, filters
-from recipe.models import Recipe, Tag
+from recipe.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
+                           ShoppingList, Tag)
+from recipe.popularity import RANKINGS
 
 
 class RecipeFilter(FilterSet):
     tags = filters.ModelMultipleChoiceFilter(
         queryset=Tag.objects.all(),
-        field_name='tags__slug',
         to_field_name='slug',
+        method='get_tags'
+    )
+    ingredients = filters.ModelMultipleChoiceFilter(
+        queryset=Ingredient.objects.all(),
+        method='get_ingredients'
+    )
+    exclude_ingredients = filters.ModelMultipleChoiceFilter(
+        queryset=Ingredient.objects.all(),
+        method='get_exclude_ingredients'
+    )
+    min_cooking_time = filters.NumberFilter(
+        field_name='cooking_time',
+        lookup_expr='gte'
+    )
+    max_cooking_time = filters.NumberFilter(
+        field_name='cooking_time',
+        lookup_expr='lte'
     )
     is_favorited = filters.BooleanFilter(
         method='get_is_favorited'
@@ -14,17 +33,53 @@ class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    ordering = filters.ChoiceFilter(
+        choices=[(name, name) for name in RANKINGS],
+        method='get_ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = ('author', 'tags', 'ingredients', 'exclude_ingredients',
+                  'min_cooking_time', 'max_cooking_time',
+                  'is_favorited', 'is_in_shopping_cart', 'ordering')
+
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag__in=value
+        )))
+
+    def get_ingredients(self, queryset, name, value):
+        for ingredient in value:
+            queryset = queryset.filter(Exists(IngredientRecipe.objects.filter(
+                recipe=OuterRef('pk'), ingredient=ingredient
+            )))
+        return queryset
+
+    def get_exclude_ingredients(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(~Exists(IngredientRecipe.objects.filter(
+            recipe=OuterRef('pk'), ingredient__in=value
+        )))
 
     def get_is_favorited(self, queryset, name, value):
         if self.request.user.is_authenticated and value:
-            return queryset.filter(favorites__user=self.request.user)
+            return queryset.filter(Exists(Favorite.objects.filter(
+                recipe=OuterRef('pk'), user=self.request.user
+            )))
         return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         if self.request.user.is_authenticated and value:
-            return queryset.filter(shoppings__user=self.request.user)
+            return queryset.filter(Exists(ShoppingList.objects.filter(
+                recipe=OuterRef('pk'), user=self.request.user
+            )))
         return queryset
+
+    def get_ordering(self, queryset, name, value):
+        return queryset.annotate(
+            score=F(f'popularity__{value}')
+        ).filter(score__gt=0)
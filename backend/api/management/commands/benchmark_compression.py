@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from backend.compression import brotli, compress
+
+LEVELS = {
+    'gzip': (1, 4, 6, 9),
+    'br': (1, 4, 5, 8, 11),
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает затраты CPU и экономию трафика при сжатии '
+            'ответов API разными алгоритмами и уровнями')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            default=['/api/ingredients/', '/api/recipes/?limit=50',
+                     '/api/tags/']
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        client = Client()
+        encodings = LEVELS if brotli is not None else {'gzip': LEVELS['gzip']}
+        for path in options['paths']:
+            response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+            if response.status_code != 200:
+                raise CommandError(f'{path}: статус {response.status_code}')
+            content = response.content
+            self.stdout.write(f'\n{path}: {len(content)} байт')
+            self.stdout.write(
+                f'{"алгоритм":>10} {"уровень":>8} {"байт":>10} '
+                f'{"сжатие":>8} {"мс":>8} {"МБ/с":>8}'
+            )
+            for encoding, levels in encodings.items():
+                for level in levels:
+                    started = time.perf_counter()
+                    for _ in range(options['repeat']):
+                        compressed = compress(content, encoding, level)
+                    elapsed = (time.perf_counter() - started) / options[
+                        'repeat']
+                    self.stdout.write(
+                        f'{encoding:>10} {level:>8} {len(compressed):>10} '
+                        f'{len(content) / len(compressed):>8.1f} '
+                        f'{elapsed * 1000:>8.2f} '
+                        f'{len(content) / elapsed / 2 ** 20:>8.1f}'
+                    )
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from backend.warmup import get_memory, warm_up
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время первых запросов и память воркеров, '
+            'запущенных через fork без прогрева и после прогрева')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            default=['/api/tags/', '/api/ingredients/', '/api/recipes/']
+        )
+        parser.add_argument('--workers', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if not hasattr(os, 'fork'):
+            raise CommandError('Для замера нужна ОС с поддержкой fork')
+        self.client = Client()
+        self.client.handler.load_middleware()
+        connections.close_all()
+        cold = self.run_workers(options['paths'], options['workers'])
+        stats = warm_up(freeze=True)
+        warm = self.run_workers(options['paths'], options['workers'])
+        self.stdout.write(f'Прогрев: {stats["seconds"] * 1000:.1f} мс, '
+                          f'память мастера {stats["memory"]} КБ')
+        self.stdout.write(
+            f'{"":>6} {"путь":<24} {"первый, мс":>11} {"повтор, мс":>11}'
+        )
+        for mode, results in (('холод', cold), ('прогрев', warm)):
+            for path in options['paths']:
+                first = [result['first'][path] for result in results]
+                repeat = [result['repeat'][path] for result in results]
+                self.stdout.write(
+                    f'{mode:>6} {path:<24} '
+                    f'{sum(first) / len(first) * 1000:>11.1f} '
+                    f'{sum(repeat) / len(repeat) * 1000:>11.1f}'
+                )
+        self.stdout.write(
+            f'\n{"":>6} {"RSS, КБ":>10} {"PSS, КБ":>10} {"USS, КБ":>10}'
+        )
+        for mode, results in (('холод', cold), ('прогрев', warm)):
+            memory = [result['memory'] for result in results]
+            self.stdout.write(f'{mode:>6} ' + ' '.join(
+                f'{sum(item[key] for item in memory) // len(memory):>10}'
+                for key in ('rss', 'pss', 'uss')
+            ))
+
+    def run_workers(self, paths, workers):
+        results = []
+        for _ in range(workers):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                try:
+                    result = json.dumps(self.measure(paths)).encode()
+                    with os.fdopen(write_fd, 'wb') as f:
+                        f.write(result)
+                finally:
+                    os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd, 'rb') as f:
+                data = f.read()
+            os.waitpid(pid, 0)
+            if not data:
+                raise CommandError(f'Воркер {pid} завершился с ошибкой')
+            results.append(json.loads(data))
+        return results
+
+    def measure(self, paths):
+        result = {'first': {}, 'repeat': {}}
+        for key in ('first', 'repeat'):
+            for path in paths:
+                started = time.perf_counter()
+                self.client.get(path)
+                result[key][path] = time.perf_counter() - started
+        result['memory'] = get_memory()
+        connections.close_all()
+        return result
@@ -0,0 +1,55 @@
+import json
+from collections import defaultdict
+
+from api.profiling import EndpointProfiler
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Многократно выполняет запрос к /api/ через весь стек '
+            'и формирует отчёт: профиль, SQL-запросы, повторы, планы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Например /api/recipes/')
+        parser.add_argument('--method', default='get')
+        parser.add_argument('--user', help='email пользователя')
+        parser.add_argument(
+            '--param', action='append', default=[],
+            help='Параметр запроса key=value, можно повторять'
+        )
+        parser.add_argument('--data', help='Тело запроса в JSON')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument(
+            '--explain', type=int, default=0,
+            help='Сколько самых медленных запросов разобрать EXPLAIN'
+        )
+        parser.add_argument('--output', help='Файл для отчёта')
+
+    def handle(self, *args, **options):
+        if not options['path'].startswith('/api/'):
+            raise CommandError('Путь должен начинаться с /api/')
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть больше 0')
+        user = None
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден'
+                )
+        params = defaultdict(list)
+        for param in options['param']:
+            key, _, value = param.partition('=')
+            params[key].append(value)
+        data = json.loads(options['data']) if options['data'] else None
+        report = EndpointProfiler(
+            options['path'], options['method'], user, dict(params),
+            data, options['repeat']
+        ).run(options['explain'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(report)
+            self.stdout.write(f'Отчёт сохранён в {options["output"]}')
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,10 @@
+from api.catalog import publish_catalogs
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Публикует снимки каталогов ингредиентов и тегов'
+
+    def handle(self, *args, **options):
+        for name, catalog in publish_catalogs().items():
+            self.stdout.write(f'{name}: {catalog["url"]}')
@@ -0,0 +1,21 @@
+import time
+
+from api.documents import BATCH_SIZE, render_all_documents
+from django.core.management.base import BaseCommand
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает готовые документы рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+        render_all_documents(recipe_ids, options['batch_size'])
+        self.stdout.write(
+            f'Документы перестроены: {len(recipe_ids)}, '
+            f'время {time.perf_counter() - started:.2f} с.'
+        )
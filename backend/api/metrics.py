@@ -0,0 +1,40 @@
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'metrics:'
+
+_names = set()
+_local = Counter()
+_lock = threading.Lock()
+
+
+def register(*names):
+    _names.update(names)
+
+
+def increment(name, value=1):
+    _names.add(name)
+    with _lock:
+        _local[name] += value
+    key = KEY_PREFIX + name
+    try:
+        cache.add(key, 0, None)
+        cache.incr(key, value)
+    except Exception:
+        pass
+
+
+def snapshot():
+    try:
+        shared = cache.get_many([KEY_PREFIX + name for name in _names])
+    except Exception:
+        shared = {}
+    return {
+        name: {
+            'total': shared.get(KEY_PREFIX + name, _local[name]),
+            'process': _local[name],
+        }
+        for name in sorted(_names)
+    }
@@ -1,5 +1,19 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class PkCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return self.object_list.values('pk').order_by().count()
 
 
 class PageLimitPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+    django_paginator_class = PkCountPaginator
+
+
+class RankingCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    ordering = ('-score', '-id')
@@ -0,0 +1,213 @@
+import cProfile
+import io
+import pstats
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from urllib.parse import urlencode
+
+from django.db import connections, transaction
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+SOURCE_FILES = ('api/serializers.py', 'api/filters.py', 'api/views.py',
+                'recipe/models.py')
+SOURCE_MODULES = ('api.serializers', 'api.filters', 'api.views')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def get_source():
+    frame = sys._getframe(1)
+    owner = None
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace('\\', '/')
+        if filename.endswith(SOURCE_FILES):
+            path = '/'.join(filename.split('/')[-2:])
+            return f'{path}:{frame.f_lineno} {frame.f_code.co_name}'
+        instance = frame.f_locals.get('self')
+        if owner is None and type(instance).__module__ in SOURCE_MODULES:
+            field = frame.f_locals.get('field')
+            if field is None and getattr(instance, 'parent', None):
+                field, instance = instance, instance.parent
+            owner = type(instance).__name__ + '.' + getattr(
+                field, 'field_name', frame.f_code.co_name
+            )
+        frame = frame.f_back
+    return owner or '-'
+
+
+class QueryRecorder:
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        source = get_source()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': params,
+                'time': time.perf_counter() - started,
+                'source': source,
+            })
+
+
+class EndpointProfiler:
+    def __init__(self, path, method='get', user=None, params=None,
+                 data=None, repeat=10):
+        self.path = path
+        self.method = method.lower()
+        self.user = user
+        self.params = params or {}
+        self.data = data
+        self.repeat = repeat
+        self.timings = []
+        self.statuses = Counter()
+        self.recorders = []
+        self.profile = cProfile.Profile()
+
+    def run(self, explain=0):
+        with transaction.atomic():
+            client = Client()
+            headers = {}
+            if self.user is not None:
+                token, _ = Token.objects.get_or_create(user=self.user)
+                headers['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+            self.recorders = [
+                QueryRecorder(connection.alias)
+                for connection in connections.all()
+            ]
+            with ExitStack() as stack:
+                for recorder in self.recorders:
+                    stack.enter_context(
+                        connections[recorder.alias].execute_wrapper(recorder)
+                    )
+                for _ in range(self.repeat):
+                    started = time.perf_counter()
+                    self.profile.enable()
+                    response = self.request(client, headers)
+                    self.profile.disable()
+                    self.timings.append(time.perf_counter() - started)
+                    self.statuses[response.status_code] += 1
+            plans = self.explain(explain)
+            transaction.set_rollback(True)
+        return self.report(plans)
+
+    def request(self, client, headers):
+        handler = getattr(client, self.method)
+        if self.method in ('get', 'head'):
+            return handler(self.path, self.params, **headers)
+        return handler(self.path + self.get_query_string(), self.data or {},
+                       content_type='application/json', **headers)
+
+    def get_query_string(self):
+        if not self.params:
+            return ''
+        return '?' + urlencode(self.params, doseq=True)
+
+    @property
+    def queries(self):
+        return [query for recorder in self.recorders
+                for query in recorder.queries]
+
+    def explain(self, count):
+        plans = []
+        slowest = sorted(
+            (query for query in self.queries
+             if query['sql'].lstrip().upper().startswith('SELECT')),
+            key=lambda query: query['time'], reverse=True
+        )[:count]
+        for query in slowest:
+            connection = connections[query['alias']]
+            prefix = ('EXPLAIN ANALYZE ' if connection.vendor == 'postgresql'
+                      else 'EXPLAIN QUERY PLAN ')
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + query['sql'], query['params'])
+                plan = '\n'.join(
+                    ' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                )
+            plans.append((query, plan))
+        return plans
+
+    def report(self, plans):
+        lines = []
+        queries = self.queries
+        total = sum(self.timings)
+        lines.append(f'{self.method.upper()} {self.path} '
+                     f'× {self.repeat}, статусы: {dict(self.statuses)}')
+        lines.append(
+            f'Время ответа, мс: среднее {total / self.repeat * 1000:.1f}, '
+            f'мин {min(self.timings) * 1000:.1f}, '
+            f'макс {max(self.timings) * 1000:.1f}'
+        )
+        sql_time = sum(query['time'] for query in queries)
+        lines.append(
+            f'SQL: {len(queries) / self.repeat:.1f} запросов на прогон, '
+            f'{sql_time / self.repeat * 1000:.1f} мс на прогон'
+        )
+
+        lines.append('\nЗапросы по источнику (на прогон):')
+        by_source = defaultdict(lambda: [0, 0.0])
+        for query in queries:
+            by_source[query['source']][0] += 1
+            by_source[query['source']][1] += query['time']
+        for source, (count, spent) in sorted(
+                by_source.items(), key=lambda item: -item[1][1]):
+            lines.append(f'  {count / self.repeat:8.1f}  '
+                         f'{spent / self.repeat * 1000:8.2f} мс  {source}')
+
+        lines.append('\nПовторяющиеся запросы (на прогон):')
+        templates = Counter(
+            (LITERALS.sub('?', query['sql']), query['source'])
+            for query in queries
+        )
+        exact = Counter((query['sql'], str(query['params']))
+                        for query in queries)
+        duplicates = [(template, count) for template, count
+                      in templates.most_common() if count > self.repeat]
+        for (sql, source), count in duplicates:
+            lines.append(f'  {count / self.repeat:8.1f}×  {source}\n'
+                         f'            {sql[:300]}')
+        if not duplicates:
+            lines.append('  нет')
+        exact_duplicates = sum(
+            count - self.repeat for count in exact.values()
+            if count > self.repeat
+        )
+        lines.append(f'  Полностью совпадающих повторов: '
+                     f'{exact_duplicates / self.repeat:.1f} на прогон')
+
+        if plans:
+            lines.append('\nПланы самых медленных запросов:')
+            for query, plan in plans:
+                lines.append(f'  {query["time"] * 1000:.2f} мс  '
+                             f'{query["source"]}\n  {query["sql"][:300]}')
+                lines.append('    ' + plan.replace('\n', '\n    '))
+
+        lines.append('\nПрофиль кода проекта (cumulative):')
+        stats = pstats.Stats(self.profile)
+        own = sorted(
+            ((key, value) for key, value in stats.stats.items()
+             if key[0].replace('\\', '/').endswith(SOURCE_FILES)),
+            key=lambda item: -item[1][3]
+        )
+        for (filename, lineno, name), (_, calls, _, cumtime, _) in own[:20]:
+            path = '/'.join(filename.replace('\\', '/').split('/')[-2:])
+            lines.append(f'  {cumtime / self.repeat * 1000:8.2f} мс  '
+                         f'{calls / self.repeat:8.1f} вызовов  '
+                         f'{path}:{lineno} {name}')
+
+        lines.append('\nПолный профиль:')
+        buffer = io.StringIO()
+        pstats.Stats(self.profile, stream=buffer).sort_stats(
+            'cumulative'
+        ).print_stats(30)
+        lines.append(buffer.getvalue())
+        return '\n'.join(lines)
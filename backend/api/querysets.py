@@ -0,0 +1,97 @@
+from django.db.models import (BooleanField, Count, Exists, OuterRef, Prefetch,
+                              Subquery, Value)
+from django.db.models.functions import Coalesce
+from recipe.models import Favorite, IngredientRecipe, Recipe, ShoppingList, Tag
+from users.models import Follow
+
+
+def count_subquery(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(count=Count('pk')).values('count')
+    ), 0)
+
+
+RECIPE_FIELDS = ('id', 'tags', 'author', 'ingredients', 'is_favorited',
+                 'is_in_shopping_cart', 'name', 'image', 'text',
+                 'cooking_time')
+RECIPE_RELATIONS = ('tags', 'author', 'ingredients')
+RECIPE_COLUMNS = ('name', 'image', 'text', 'cooking_time')
+AUTHOR_COLUMNS = ('email', 'username', 'first_name', 'last_name')
+FOLLOW_FIELDS = ('email', 'id', 'username', 'first_name', 'last_name',
+                 'is_subscribed', 'recipes', 'recipes_count')
+FOLLOW_RELATIONS = ('recipes',)
+
+
+def select_recipe_fields(queryset, fields, expand):
+    columns = ['id'] + [name for name in RECIPE_COLUMNS if name in fields]
+    if 'author' in fields:
+        columns.append('author')
+    if 'author' in expand:
+        queryset = queryset.select_related('author')
+        columns.extend(f'author__{name}' for name in AUTHOR_COLUMNS)
+    if 'tags' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'tags', queryset=(Tag.objects.all() if 'tags' in expand
+                              else Tag.objects.only('id'))
+        ))
+    if 'ingredients' in expand:
+        queryset = queryset.prefetch_related('ingredientrecipes__ingredient')
+    elif 'ingredients' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'ingredientrecipes',
+            queryset=IngredientRecipe.objects.only('recipe', 'ingredient')
+        ))
+    return queryset.only(*columns)
+
+
+def select_follow_fields(queryset, fields, expand):
+    if fields is None:
+        fields = FOLLOW_FIELDS
+    queryset = queryset.only('id', *(
+        name for name in AUTHOR_COLUMNS if name in fields
+    )).annotate(is_subscribed=Value(True, output_field=BooleanField()))
+    if 'recipes_count' in fields:
+        queryset = queryset.annotate(
+            recipes_count=count_subquery(Recipe.objects.all(), 'author')
+        )
+    if 'recipes' in fields:
+        columns = (('id', 'author', 'name', 'image', 'cooking_time')
+                   if 'recipes' in expand else ('id', 'author'))
+        queryset = queryset.prefetch_related(Prefetch(
+            'recipes', queryset=Recipe.objects.only(*columns)
+        ))
+    return queryset
+
+
+def annotate_user_stats(queryset, user):
+    if user.is_authenticated:
+        is_subscribed = Exists(Follow.objects.filter(
+            user=user, following=OuterRef('pk')
+        ))
+    else:
+        is_subscribed = Value(False, output_field=BooleanField())
+    return queryset.annotate(
+        is_subscribed=is_subscribed,
+        recipes_count=count_subquery(Recipe.objects.all(), 'author'),
+        followers_count=count_subquery(Follow.objects.all(), 'following'),
+    )
+
+
+def get_user_flags(user, recipe_ids, author_ids):
+    favorites = carts = follows = set()
+    if not user.is_authenticated:
+        return favorites, carts, follows
+    if recipe_ids:
+        favorites = set(Favorite.objects.filter(
+            user=user, recipe_id__in=recipe_ids
+        ).values_list('recipe_id', flat=True))
+        carts = set(ShoppingList.objects.filter(
+            user=user, recipe_id__in=recipe_ids
+        ).values_list('recipe_id', flat=True))
+    if author_ids:
+        follows = set(Follow.objects.filter(
+            user=user, following_id__in=author_ids
+        ).values_list('following_id', flat=True))
+    return favorites, carts, follows
@@ -1,14 +1,35 @@
 import base64
+from collections import Counter
 
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from recipe.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
                            ShoppingList, Tag)
+from recipe.signals import notify_recipe_changed
+from recipe.sync import SYNC_LIMIT
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from users.models import Follow, User
 
+USER_STATE_MAX_IDS = 300
+RECIPE_BULK_MAX_ITEMS = 500
+
+
+def validate_ingredients(ingredients):
+    ingredients_list = []
+    for ingredient in ingredients:
+        if ingredient.get('amount') <= 0:
+            raise serializers.ValidationError(
+                'Количество ингредиентов должно быть больше 0'
+            )
+        ingredients_list.append(ingredient.get('id'))
+    if len(set(ingredients_list)) != len(ingredients_list):
+        raise serializers.ValidationError(
+            'Нельзя добавлять одинаковые ингредиенты'
+        )
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
@@ -19,6 +40,23 @@ class Base64ImageField(serializers.ImageField):
         return super().to_internal_value(data)
 
 
+class SparseFieldsMixin:
+    compact_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        expand = self.context.get('expand', ())
+        return {
+            name: (getattr(self, self.compact_fields[name])()
+                   if name in self.compact_fields and name not in expand
+                   else field)
+            for name, field in fields.items() if name in requested
+        }
+
+
 class CustomUserCreateSerialiser(UserCreateSerializer):
     class Meta:
         model = User
@@ -35,6 +73,8 @@ class CustomUserSerialiser(UserSerializer):
                   'last_name', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         return (request.user.is_authenticated
                 and Follow.objects.filter(
@@ -42,6 +82,16 @@ class CustomUserSerialiser(UserSerializer):
                 ).exists())
 
 
+class UserStatsSerializer(CustomUserSerialiser):
+    recipes_count = serializers.IntegerField(read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('email', 'id', 'username', 'first_name', 'last_name',
+                  'is_subscribed', 'recipes_count', 'followers_count')
+
+
 class RecipeBriefSerializer(serializers.ModelSerializer):
     image = Base64ImageField()
 
@@ -62,10 +112,11 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit')
 
 
-class UserFollowGetSerializer(CustomUserSerialiser):
+class UserFollowGetSerializer(SparseFieldsMixin, CustomUserSerialiser):
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
     recipes_count = serializers.SerializerMethodField()
+    compact_fields = {'recipes': 'get_compact_recipes_field'}
 
     class Meta:
         model = User
@@ -74,7 +125,10 @@ class UserFollowGetSerializer(CustomUserSerialiser):
         read_only_fields = ('email', 'username', 'first_name', 'last_name',
                             'is_subscribed', 'recipes', 'recipes_count')
 
-    def get_recipes(self, obj):
+    def get_compact_recipes_field(self):
+        return serializers.SerializerMethodField('get_recipe_ids')
+
+    def get_limited_recipes(self, obj):
         request = self.context.get('request')
         recipes_limit = None
         if request:
@@ -82,10 +136,20 @@ class UserFollowGetSerializer(CustomUserSerialiser):
         recipes = obj.recipes.all()
         if recipes_limit:
             recipes = obj.recipes.all()[:int(recipes_limit)]
-        return RecipeBriefSerializer(recipes, many=True,
+        return recipes
+
+    def get_recipes(self, obj):
+        request = self.context.get('request')
+        return RecipeBriefSerializer(self.get_limited_recipes(obj),
+                                     many=True,
                                      context={'request': request}).data
 
+    def get_recipe_ids(self, obj):
+        return [recipe.id for recipe in self.get_limited_recipes(obj)]
+
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
         return obj.recipes.count()
 
 
@@ -169,6 +233,72 @@ class RecipeGetSerializer(serializers.ModelSerializer):
                 ).exists())
 
 
+class AuthorDocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('email', 'id', 'username', 'first_name', 'last_name')
+
+
+class RecipeDocumentSerializer(serializers.ModelSerializer):
+    tags = TagSerialiser(many=True)
+    author = AuthorDocumentSerializer()
+    ingredients = IngredientGetSerializer(many=True,
+                                          source='ingredientrecipes')
+    image = serializers.ImageField()
+
+    class Meta:
+        model = Recipe
+        fields = ('id', 'tags', 'author', 'ingredients', 'name',
+                  'image', 'text', 'cooking_time')
+
+
+class AuthorStateSerializer(AuthorDocumentSerializer):
+    is_subscribed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('email', 'id', 'username', 'first_name', 'last_name',
+                  'is_subscribed')
+
+    def get_is_subscribed(self, obj):
+        return obj.id in self.context['follows']
+
+
+class RecipeSparseSerializer(SparseFieldsMixin, RecipeDocumentSerializer):
+    author = AuthorStateSerializer()
+    is_favorited = serializers.SerializerMethodField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
+    compact_fields = {
+        'tags': 'get_compact_tags_field',
+        'author': 'get_compact_author_field',
+        'ingredients': 'get_compact_ingredients_field',
+    }
+
+    class Meta:
+        model = Recipe
+        fields = ('id', 'tags', 'author', 'ingredients', 'is_favorited',
+                  'is_in_shopping_cart', 'name', 'image', 'text',
+                  'cooking_time')
+
+    def get_compact_tags_field(self):
+        return serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    def get_compact_author_field(self):
+        return serializers.PrimaryKeyRelatedField(read_only=True)
+
+    def get_compact_ingredients_field(self):
+        return serializers.SlugRelatedField(
+            many=True, read_only=True, slug_field='ingredient_id',
+            source='ingredientrecipes'
+        )
+
+    def get_is_favorited(self, obj):
+        return obj.id in self.context['favorites']
+
+    def get_is_in_shopping_cart(self, obj):
+        return obj.id in self.context['carts']
+
+
 class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     ingredients = IngredientRecipeSerializer(
         many=True)
@@ -189,20 +319,18 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
                 'Время приготовления меньше 1 минуты')
         return value
 
-    def validate(self, data):
-        ingredients_list = []
-        for ingredient in data.get('ingredients'):
-            if ingredient.get('amount') <= 0:
-                raise serializers.ValidationError(
-                    'Количество ингредиентов должно быть больше 0'
-                )
-            ingredients_list.append(ingredient.get('id'))
-        if len(set(ingredients_list)) != len(ingredients_list):
+    def validate_name(self, value):
+        if Recipe.all_objects.filter(name=value, deleted=True).exists():
             raise serializers.ValidationError(
-                'Нельзя добавлять одинаковые ингредиенты'
+                'Рецепт с таким названием удаляется, повторите позже'
             )
+        return value
+
+    def validate(self, data):
+        validate_ingredients(data.get('ingredients'))
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get('request')
         ingredients = validated_data.pop('ingredients')
@@ -221,6 +349,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         IngredientRecipe.objects.bulk_create(ingredient_recipe_list)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
@@ -249,6 +378,102 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         ).data
 
 
+class RecipeBulkItemSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=256)
+    text = serializers.CharField()
+    cooking_time = serializers.IntegerField(min_value=1, max_value=1440)
+    image = Base64ImageField()
+    tags = serializers.ListField(child=serializers.IntegerField(),
+                                 allow_empty=False)
+    ingredients = IngredientRecipeSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        validate_ingredients(data.get('ingredients'))
+        return data
+
+
+class RecipeBulkCreateSerializer(serializers.Serializer):
+    recipes = serializers.ListField(child=serializers.DictField(),
+                                    allow_empty=False,
+                                    max_length=RECIPE_BULK_MAX_ITEMS)
+    strict = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        errors = {}
+        items = []
+        for index, item in enumerate(data['recipes']):
+            serializer = RecipeBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        names = Counter(item['name'] for _, item in items)
+        existing = set(Recipe.all_objects.filter(
+            name__in=names
+        ).values_list('name', flat=True))
+        tags = set(Tag.objects.filter(id__in={
+            pk for _, item in items for pk in item['tags']
+        }).values_list('id', flat=True))
+        ingredients = set(Ingredient.objects.filter(id__in={
+            ingredient['id'] for _, item in items
+            for ingredient in item['ingredients']
+        }).values_list('id', flat=True))
+        valid = []
+        for index, item in items:
+            item_errors = []
+            if item['name'] in existing:
+                item_errors.append('Рецепт с таким названием уже существует')
+            elif names[item['name']] > 1:
+                item_errors.append('Название повторяется в запросе')
+            missing_tags = set(item['tags']) - tags
+            if missing_tags:
+                item_errors.append(f'Теги не найдены: {sorted(missing_tags)}')
+            missing_ingredients = {
+                ingredient['id'] for ingredient in item['ingredients']
+            } - ingredients
+            if missing_ingredients:
+                item_errors.append(
+                    f'Ингредиенты не найдены: {sorted(missing_ingredients)}'
+                )
+            if item_errors:
+                errors[index] = item_errors
+            else:
+                valid.append((index, item))
+        if errors and data['strict']:
+            raise serializers.ValidationError({'errors': errors})
+        data['valid'] = valid
+        data['errors'] = errors
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        request = self.context.get('request')
+        items = validated_data['valid']
+        with transaction.atomic():
+            Recipe.objects.bulk_create([
+                Recipe(author=request.user, name=item['name'],
+                       text=item['text'], cooking_time=item['cooking_time'],
+                       image=item['image'])
+                for _, item in items
+            ])
+            ids = dict(Recipe.objects.filter(
+                name__in=[item['name'] for _, item in items]
+            ).values_list('name', 'id'))
+            Recipe.tags.through.objects.bulk_create([
+                Recipe.tags.through(recipe_id=ids[item['name']], tag_id=pk)
+                for _, item in items for pk in set(item['tags'])
+            ])
+            IngredientRecipe.objects.bulk_create([
+                IngredientRecipe(recipe_id=ids[item['name']],
+                                 ingredient_id=ingredient['id'],
+                                 amount=ingredient['amount'])
+                for _, item in items for ingredient in item['ingredients']
+            ])
+            notify_recipe_changed(ids.values())
+        return [{'index': index, 'id': ids[item['name']],
+                 'name': item['name']} for index, item in items]
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
@@ -287,3 +512,22 @@ class ShoppingListSerializer(serializers.ModelSerializer):
             instance.recipe,
             context={'request': request}
         ).data
+
+
+class UserStateQuerySerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=USER_STATE_MAX_IDS,
+        default=list
+    )
+    authors = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=USER_STATE_MAX_IDS,
+        default=list
+    )
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=SYNC_LIMIT,
+                                     default=SYNC_LIMIT)
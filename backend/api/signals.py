@@ -0,0 +1,40 @@
+from api.catalog import schedule_publish
+from api.documents import render_documents, schedule_render
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from recipe.models import Ingredient, Recipe, Tag
+from recipe.signals import ingredients_imported, recipe_changed
+from users.models import User
+
+
+@receiver(recipe_changed)
+def update_recipe_documents(sender, recipe_ids, **kwargs):
+    render_documents(recipe_ids)
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, **kwargs):
+    if not created:
+        schedule_render(Recipe.objects.filter(tags=instance))
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, **kwargs):
+    if not created:
+        schedule_render(Recipe.objects.filter(ingredients=instance))
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    schedule_render(instance.recipes.all())
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(ingredients_imported)
+def catalog_changed(sender, **kwargs):
+    schedule_publish()
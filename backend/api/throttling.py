@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+
+from api import metrics
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCK_ATTEMPTS = 20
+LOCK_DELAY = 0.005
+LOCK_TIMEOUT = 1
+
+metrics.register(*(
+    f'throttle.{scope}.{decision}'
+    for scope in api_settings.DEFAULT_THROTTLE_RATES
+    for decision in ('allowed', 'throttled')
+))
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period[0]]
+
+
+def take_token(tokens, updated, capacity, refill_rate, now):
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return tokens - 1, True
+    return tokens, False
+
+
+class LocalBuckets:
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def update(self, key, capacity, refill_rate, now):
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens, allowed = take_token(
+                tokens, updated, capacity, refill_rate, now
+            )
+            self.buckets[key] = (tokens, now)
+            return tokens, allowed
+
+
+local_buckets = LocalBuckets()
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class TokenBucketThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        self.capacity, self.refill_rate = parse_rate(rate)
+        ident = (request.user.pk if request.user.is_authenticated
+                 else self.get_ident(request))
+        key = f'throttle:{self.scope}:{ident}'
+        now = time.time()
+        try:
+            self.tokens, allowed = self.update_shared(key, now)
+        except Exception:
+            self.tokens, allowed = local_buckets.update(
+                key, self.capacity, self.refill_rate, now
+            )
+        decision = 'allowed' if allowed else 'throttled'
+        metrics.increment(f'throttle.{self.scope}.{decision}')
+        if not allowed:
+            logger.info('Throttled %s for %s', self.scope, ident)
+        return allowed
+
+    def update_shared(self, key, now):
+        cache = caches[settings.THROTTLE_CACHE]
+        lock = f'{key}:lock'
+        for _ in range(LOCK_ATTEMPTS):
+            if cache.add(lock, 1, LOCK_TIMEOUT):
+                break
+            time.sleep(LOCK_DELAY)
+        else:
+            raise LockTimeout(key)
+        try:
+            tokens, updated = cache.get(key, (self.capacity, now))
+            now = max(now, updated)
+            tokens, allowed = take_token(
+                tokens, updated, self.capacity, self.refill_rate, now
+            )
+            cache.set(key, (tokens, now),
+                      int(self.capacity / self.refill_rate) + 1)
+        finally:
+            cache.delete(lock)
+        return tokens, allowed
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
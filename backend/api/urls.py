@@ -1,11 +1,15 @@
-from api.views import (APIFavorite, APIShoppingList, APIShoppingListDownload,
-                       APIUserFollow, GetFollowViewSet, IngredientViewSet,
-                       RecipeViewSet, TagViewSet)
+from api.views import (APICatalog, APIFavorite, APIMetrics,
+                       APIRecipeBulkCreate, APIRecipeExport, APIShoppingList,
+                       APIShoppingListDownload, APISimilarRecipes, APISync,
+                       APIUserFollow, APIUserState, CustomUserViewSet,
+                       GetFollowViewSet, IngredientViewSet, RecipeViewSet,
+                       TagViewSet)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 
+router.register('users', CustomUserViewSet, basename='user')
 router.register('tags', TagViewSet, basename='tags')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
 router.register('recipes', RecipeViewSet, basename='recipes')
@@ -16,8 +20,14 @@ urlpatterns = [
     path('users/<int:user_id>/subscribe/', APIUserFollow.as_view()),
     path('recipes/<int:pk>/favorite/', APIFavorite.as_view()),
     path('recipes/<int:pk>/shopping_cart/', APIShoppingList.as_view()),
+    path('recipes/<int:pk>/similar/', APISimilarRecipes.as_view()),
     path('recipes/download_shopping_cart/', APIShoppingListDownload.as_view()),
-    path('', include('djoser.urls')),
+    path('recipes/export/', APIRecipeExport.as_view()),
+    path('recipes/bulk/', APIRecipeBulkCreate.as_view()),
+    path('user_state/', APIUserState.as_view()),
+    path('sync/', APISync.as_view()),
+    path('catalog/', APICatalog.as_view()),
+    path('metrics/', APIMetrics.as_view()),
     path('auth/', include('djoser.urls.authtoken')),
     path('', include(router.urls)),
 ]
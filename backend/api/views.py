@@ -1,24 +1,59 @@
+from api import metrics
+from api.catalog import get_manifest, get_snapshot
+from api.documents import get_documents, get_sparse_documents
+from api.fieldsets import get_fieldsets
 from api.filters import RecipeFilter
+from api.pagination import PageLimitPagination, RankingCursorPagination
 from api.permissions import AuthorAdminReadOnly
+from api.querysets import (FOLLOW_FIELDS, FOLLOW_RELATIONS, RECIPE_FIELDS,
+                           RECIPE_RELATIONS, annotate_user_stats,
+                           get_user_flags, select_follow_fields,
+                           select_recipe_fields)
 from api.serializers import (FavoriteSerializer, FollowSerializer,
-                             IngredientSerializer,
+                             IngredientSerializer, RecipeBriefSerializer,
+                             RecipeBulkCreateSerializer,
                              RecipeCreateUpdateSerializer, RecipeGetSerializer,
-                             ShoppingListSerializer, TagSerialiser,
-                             UserFollowGetSerializer)
+                             ShoppingListSerializer, SyncQuerySerializer,
+                             TagSerialiser, UserFollowGetSerializer,
+                             UserStateQuerySerializer)
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from django.shortcuts import HttpResponse, get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
-from recipe.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                           ShoppingList, Tag)
+from djoser.views import UserViewSet
+from recipe.deletion import schedule_deletion
+from recipe.models import (Change, Favorite, Ingredient, IngredientRecipe,
+                           Recipe, ShoppingList, Tag)
+from recipe.ndjson import export_recipes
+from recipe.popularity import RANKINGS
+from recipe.similarity import get_similar_recipes
+from recipe.sync import collapse, get_changes
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from users.models import Follow, User
 
 
+class CustomUserViewSet(UserViewSet):
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('id', 'recipes_count', 'followers_count')
+    ordering = ('id',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(is_active=True)
+        if self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            return annotate_user_stats(queryset, self.request.user)
+        return queryset
+
+    def perform_destroy(self, instance):
+        schedule_deletion(instance)
+
+
 class APIUserFollow(APIView):
     def post(self, request, user_id):
-        author = get_object_or_404(User, id=user_id)
+        author = get_object_or_404(User, id=user_id, is_active=True)
         serializer = FollowSerializer(
             data={'user': request.user.id, 'following': author.id},
             context={'request': request}
@@ -43,19 +78,72 @@ class APIUserFollow(APIView):
 class GetFollowViewSet(mixins.ListModelMixin,
                        viewsets.GenericViewSet):
     serializer_class = UserFollowGetSerializer
+    throttle_scope = 'subscriptions'
 
     def get_queryset(self):
-        return User.objects.filter(following__user=self.request.user)
+        fields, expand = self.get_fieldsets()
+        return select_follow_fields(
+            User.objects.filter(following__user=self.request.user,
+                                is_active=True),
+            fields, expand
+        ).order_by('id')
+
+    def get_fieldsets(self):
+        return get_fieldsets(self.request, FOLLOW_FIELDS, FOLLOW_RELATIONS)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_fieldsets()
+        return context
+
+
+class CatalogVersionMixin:
+    catalog_name = None
+
+    @cached_property
+    def catalog_version(self):
+        return get_manifest().get(self.catalog_name, {}).get('version')
+
+    def list(self, request, *args, **kwargs):
+        if (self.catalog_version and not request.query_params
+                and request.accepted_renderer.format == 'json'):
+            return HttpResponse(
+                get_snapshot(self.catalog_name, self.catalog_version).content,
+                content_type='application/json'
+            )
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.catalog_version:
+            response['X-Catalog-Version'] = self.catalog_version
+        return response
+
+
+class APICatalog(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        return Response({
+            name: {**catalog, 'url': request.build_absolute_uri(
+                catalog['url']
+            )}
+            for name, catalog in get_manifest().items()
+        })
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogVersionMixin, viewsets.ReadOnlyModelViewSet):
+    catalog_name = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerialiser
     permission_classes = (AllowAny,)
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogVersionMixin, viewsets.ReadOnlyModelViewSet):
+    catalog_name = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
@@ -63,6 +151,12 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ('name',)
     pagination_class = None
 
+    @property
+    def throttle_scope(self):
+        if self.action == 'list' and not self.request.query_params:
+            return 'ingredients'
+        return None
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
@@ -71,11 +165,78 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filterset_class = RecipeFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    @property
+    def throttle_scope(self):
+        return 'recipe_create' if self.action == 'create' else None
+
+    @property
+    def pagination_class(self):
+        if self.request.query_params.get('ordering') in RANKINGS:
+            return RankingCursorPagination
+        return PageLimitPagination
+
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            fields, expand = self.get_fieldsets()
+            if fields is not None:
+                return select_recipe_fields(Recipe.objects.all(),
+                                            fields, expand)
+            return Recipe.objects.select_related('document').only(
+                'id', 'document__data'
+            )
+        return Recipe.objects.all()
+
+    def get_fieldsets(self):
+        return get_fieldsets(self.request, RECIPE_FIELDS, RECIPE_RELATIONS)
+
+    def perform_destroy(self, instance):
+        schedule_deletion(instance)
+
+    def get_recipe_data(self, recipes):
+        fields, expand = self.get_fieldsets()
+        if fields is not None:
+            return get_sparse_documents(recipes, self.request, fields,
+                                        expand)
+        return get_documents(recipes, self.request)
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeGetSerializer
         return RecipeCreateUpdateSerializer
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_recipe_data(page))
+        return Response(self.get_recipe_data(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_recipe_data([self.get_object()])[0])
+
+
+class APIRecipeBulkCreate(APIView):
+    throttle_scope = 'recipe_bulk_create'
+
+    def post(self, request):
+        serializer = RecipeBulkCreateSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            created = serializer.save()
+        except IntegrityError:
+            return Response(
+                {'errors': 'Рецепты с такими названиями уже созданы, '
+                           'повторите запрос'},
+                status=status.HTTP_409_CONFLICT)
+        return Response(
+            {'created': created,
+             'errors': serializer.validated_data['errors']},
+            status=(status.HTTP_201_CREATED if created
+                    else status.HTTP_400_BAD_REQUEST)
+        )
+
 
 class APIFavorite (APIView):
     def post(self, request, pk):
@@ -121,6 +282,8 @@ class APIShoppingList (APIView):
 
 
 class APIShoppingListDownload (APIView):
+    throttle_scope = 'shopping_cart_download'
+
     def get(self, request):
         user = request.user
         shopping_list = IngredientRecipe.get(user)
@@ -128,3 +291,102 @@ class APIShoppingListDownload (APIView):
         response['Content-Disposition'] = \
             'attachment; filename="shopping_cart.txt"'
         return response
+
+
+class APISimilarRecipes(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self, request, pk):
+        recipe = get_object_or_404(Recipe, id=pk)
+        limit = request.query_params.get('limit', '6')
+        if not limit.isdigit() or not 0 < int(limit) <= 50:
+            return Response(
+                {'errors': 'limit должен быть числом от 1 до 50'},
+                status=status.HTTP_400_BAD_REQUEST)
+        serializer = RecipeBriefSerializer(
+            get_similar_recipes(recipe, int(limit)),
+            many=True,
+            context={'request': request}
+        )
+        return Response(serializer.data)
+
+
+class APIUserState(APIView):
+    def get(self, request):
+        serializer = UserStateQuerySerializer(data={
+            name: [pk for pk in request.query_params.get(name, '').split(',')
+                   if pk]
+            for name in ('recipes', 'authors')
+        })
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        author_ids = serializer.validated_data['authors']
+        favorites, carts, follows = get_user_flags(
+            request.user, recipe_ids, author_ids
+        )
+        response = Response({
+            'recipes': {
+                pk: {'is_favorited': pk in favorites,
+                     'is_in_shopping_cart': pk in carts}
+                for pk in recipe_ids
+            },
+            'authors': {
+                pk: {'is_subscribed': pk in follows} for pk in author_ids
+            },
+        })
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+
+class APISync(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        serializer = SyncQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        cursor = serializer.validated_data['cursor']
+        entries, has_more = get_changes(
+            request.user, cursor, serializer.validated_data['limit']
+        )
+        changes = collapse(entries)
+        updated, deleted = changes[Change.RECIPE]
+        recipes = list(Recipe.objects.filter(
+            id__in=updated
+        ).select_related('document').only('id', 'document__data'))
+        missing = set(updated) - {recipe.id for recipe in recipes}
+        response = Response({
+            'cursor': entries[-1].id if entries else cursor,
+            'has_more': has_more,
+            'recipes': {
+                'updated': get_documents(recipes, request),
+                'deleted': sorted(missing.union(deleted)),
+            },
+            **{
+                name: {'added': changes[kind][0],
+                       'removed': changes[kind][1]}
+                for name, kind in (('favorites', Change.FAVORITE),
+                                   ('shopping_cart', Change.SHOPPING_CART),
+                                   ('subscriptions', Change.FOLLOW))
+            },
+        })
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+
+class APIMetrics(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class APIRecipeExport(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        response = StreamingHttpResponse(
+            export_recipes(), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = \
+            'attachment; filename="recipes.ndjson"'
+        return response
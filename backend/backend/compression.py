@@ -0,0 +1,61 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson',
+                      'text/plain')
+ACCEPT_ENCODING = re.compile(r'([a-z*]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def get_encoding(accept_encoding):
+    accepted = {}
+    for name, quality in ACCEPT_ENCODING.findall(accept_encoding.lower()):
+        accepted[name] = float(quality or 1)
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(
+            content, mode=brotli.MODE_TEXT,
+            quality=(settings.COMPRESSION_BROTLI_QUALITY
+                     if level is None else level)
+        )
+    return gzip.compress(
+        content,
+        settings.COMPRESSION_GZIP_LEVEL if level is None else level,
+        mtime=0
+    )
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT,
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
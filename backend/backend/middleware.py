@@ -0,0 +1,121 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from backend.compression import (COMPRESSIBLE_TYPES, compress, compress_stream,
+                                 get_encoding)
+from backend.routers import use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_pinned'
+
+
+def get_client_key(request):
+    token = request.META.get('HTTP_AUTHORIZATION')
+    if token:
+        return hashlib.sha1(token.encode()).hexdigest()
+    if request.user.is_authenticated:
+        return f'user-{request.user.pk}'
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.DB_CONN_HEALTH_CHECKS:
+            self.check_connections()
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        client_key = get_client_key(request)
+        pin_key = f'db-pinned:{client_key}'
+        replica = (request.method in SAFE_METHODS
+                   and request.path.startswith('/api/')
+                   and not (client_key and self.is_pinned(
+                       request, client_key, pin_key
+                   )))
+        token = use_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        if (client_key and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            cache.set(pin_key, True, settings.DB_REPLICA_PIN_SECONDS)
+            response.set_signed_cookie(
+                PIN_COOKIE, client_key, salt=PIN_COOKIE,
+                max_age=settings.DB_REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def is_pinned(self, request, client_key, pin_key):
+        if cache.get(pin_key):
+            return True
+        return request.get_signed_cookie(
+            PIN_COOKIE, None, salt=PIN_COOKIE,
+            max_age=settings.DB_REPLICA_PIN_SECONDS
+        ) == client_key
+
+    def check_connections(self):
+        for connection in connections.all():
+            if (connection.connection is not None
+                    and not connection.is_usable()):
+                connection.close()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(
+                    COMPRESSIBLE_TYPES)):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            content = self.get_compressed(request, response, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def get_compressed(self, request, response, encoding):
+        user = getattr(request, 'user', None)
+        if (request.method != 'GET' or response.status_code != 200
+                or 'HTTP_AUTHORIZATION' in request.META
+                or (user is not None and user.is_authenticated)
+                or response.has_header('Set-Cookie')
+                or len(response.content)
+                > settings.COMPRESSION_CACHE_MAX_SIZE):
+            return compress(response.content, encoding)
+        key = 'compressed:{}:{}'.format(
+            encoding, hashlib.blake2b(response.content).hexdigest()
+        )
+        content = cache.get(key)
+        if content is None:
+            content = compress(response.content, encoding)
+            cache.set(key, content, settings.COMPRESSION_CACHE_SECONDS)
+        return content
@@ -0,0 +1,26 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+use_replica = ContextVar('use_replica', default=False)
+
+PRIMARY_MODELS = ('authtoken.token', settings.AUTH_USER_MODEL.lower())
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return 'default'
+        if use_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
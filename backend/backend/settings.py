@@ -28,10 +28,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,15 +78,45 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
     }
 }
 
+# Read replicas: comma-separated hosts, e.g. DB_REPLICA_HOSTS=db-ro-1,db-ro-2
+
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'False') == 'True'
+
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', 2))
+
+WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'True') == 'True'
+
+DELETION_EXECUTOR = os.getenv('DELETION_EXECUTOR', 'none')
+DELETION_BATCH_SIZE = int(os.getenv('DELETION_BATCH_SIZE', 500))
+
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'collected_static/'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+CATALOG_URL = MEDIA_URL + 'catalog/'
+CATALOG_ROOT = os.path.join(MEDIA_ROOT, 'catalog')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,14 +162,47 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageLimitPagination',
     'PAGE_SIZE': 6,
 
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+
+    'DEFAULT_THROTTLE_RATES': {
+        'shopping_cart_download': os.getenv(
+            'THROTTLE_SHOPPING_CART_DOWNLOAD', '10/m'),
+        'ingredients': os.getenv('THROTTLE_INGREDIENTS', '30/m'),
+        'subscriptions': os.getenv('THROTTLE_SUBSCRIPTIONS', '60/m'),
+        'recipe_create': os.getenv('THROTTLE_RECIPE_CREATE', '20/m'),
+        'recipe_bulk_create': os.getenv('THROTTLE_RECIPE_BULK_CREATE', '5/m'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
 }
 
+THROTTLE_CACHE = 'default'
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+COMPRESSION_CACHE_SECONDS = int(os.getenv('COMPRESSION_CACHE_SECONDS', 300))
+
+COMPRESSION_CACHE_MAX_SIZE = 1024 * 1024
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
     'SERIALIZERS': {
         'user_create': 'api.serializers.CustomUserCreateSerialiser',
-        'user': 'api.serializers.CustomUserSerialiser',
+        'user': 'api.serializers.UserStatsSerializer',
         'current_user': 'api.serializers.CustomUserSerialiser',
     },
     'PERMISSIONS': {
@@ -0,0 +1,101 @@
+import gc
+import inspect
+import logging
+import time
+from importlib import import_module
+
+from api.catalog import load_snapshots
+from django.apps import apps
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+logger = logging.getLogger(__name__)
+
+WARMUP_APPS = ('api', 'recipe', 'users')
+WARMUP_MODULES = ('models', 'serializers', 'views', 'filters', 'signals')
+MEMORY_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'uss',
+    'Private_Dirty': 'uss',
+}
+
+
+def get_memory():
+    memory = dict.fromkeys(('rss', 'pss', 'uss', 'shared'), 0)
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in MEMORY_FIELDS:
+                    memory[MEMORY_FIELDS[name]] += int(value.split()[0])
+    except OSError:
+        import resource
+        memory['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return memory
+
+
+def import_app_modules():
+    modules = []
+    for app_label in WARMUP_APPS:
+        app = apps.get_app_config(app_label)
+        for name in WARMUP_MODULES:
+            try:
+                modules.append(import_module(f'{app.name}.{name}'))
+            except ModuleNotFoundError as error:
+                if error.name != f'{app.name}.{name}':
+                    raise
+    return modules
+
+
+def build_serializers(modules):
+    count = 0
+    for module in modules:
+        for serializer in vars(module).values():
+            if (inspect.isclass(serializer)
+                    and issubclass(serializer, BaseSerializer)
+                    and not issubclass(serializer, ListSerializer)
+                    and serializer.__module__ == module.__name__):
+                serializer(context={}).fields
+                count += 1
+    return count
+
+
+def load_catalogs():
+    try:
+        snapshots = load_snapshots()
+    except DatabaseError:
+        logger.warning('Каталоги не загружены при прогреве: БД недоступна',
+                       exc_info=True)
+        return {}
+    return {name: len(snapshot.content)
+            for name, snapshot in snapshots.items()}
+
+
+def warm_up(freeze=False):
+    started = time.perf_counter()
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for model in apps.get_models():
+        model._meta.get_fields()
+    serializers = build_serializers(import_app_modules())
+    catalogs = load_catalogs()
+    connections.close_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    stats = {
+        'seconds': time.perf_counter() - started,
+        'serializers': serializers,
+        'catalogs': catalogs,
+        'memory': get_memory(),
+    }
+    logger.info(
+        'Прогрев завершён за %.3f с: сериализаторов %s, каталоги %s, '
+        'память %s КБ', stats['seconds'], serializers, catalogs,
+        stats['memory']
+    )
+    return stats
@@ -0,0 +1,11 @@
+import os
+
+workers = int(os.getenv('GUNICORN_WORKERS', 3))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def post_worker_init(worker):
+    from backend.warmup import get_memory
+
+    worker.log.info('Воркер %s запущен, память %s КБ',
+                    worker.pid, get_memory())
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from recipe.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                           ShoppingList, Tag)
+from recipe.deletion import schedule_deletion
+from recipe.models import (DeletionJob, Favorite, Ingredient, IngredientRecipe,
+                           Recipe, ShoppingList, Tag)
 
 
 @admin.register(Tag)
@@ -36,6 +37,13 @@ class RecipeAdmin(admin.ModelAdmin):
     def favorites_amount(self, obj):
         return obj.favorites.count()
 
+    def delete_model(self, request, obj):
+        schedule_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for recipe in queryset:
+            schedule_deletion(recipe)
+
 
 @admin.register(IngredientRecipe)
 class IngredientRecipeAdmin(admin.ModelAdmin):
@@ -45,7 +53,7 @@ class IngredientRecipeAdmin(admin.ModelAdmin):
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'user', 'recipe')
+    list_display = ('pk', 'user', 'recipe', 'created')
     search_fields = ('user', 'recipe')
     empty_value_display = '-пусто-'
 
@@ -55,3 +63,13 @@ class ShoppingListAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'recipe')
     search_fields = ('user', 'recipe')
     empty_value_display = '-пусто-'
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'object_id', 'status', 'step', 'progress',
+                    'updated')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('kind', 'object_id', 'step', 'progress', 'images',
+                       'error', 'created', 'updated')
+    empty_value_display = '-пусто-'
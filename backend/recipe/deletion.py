@@ -0,0 +1,184 @@
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from recipe.models import Change, DeletionJob, Favorite, Recipe, ShoppingList
+from recipe.signals import notify_recipe_changed
+from users.models import Follow, User
+
+logger = logging.getLogger(__name__)
+
+RECIPE_BATCH_SIZE = 50
+STALE_SECONDS = 300
+
+_executor = None
+
+
+def get_recipes(job):
+    if job.kind == DeletionJob.USER:
+        return Recipe.all_objects.filter(author_id=job.object_id)
+    return Recipe.all_objects.filter(id=job.object_id)
+
+
+def get_steps(job):
+    user_id = job.object_id
+    recipes = get_recipes(job)
+    steps = []
+    if job.kind == DeletionJob.USER:
+        steps += [
+            ('follows', Follow.objects.filter(
+                Q(user_id=user_id) | Q(following_id=user_id)
+            )),
+            ('favorites', Favorite.objects.filter(user_id=user_id)),
+            ('shopping_cart', ShoppingList.objects.filter(user_id=user_id)),
+        ]
+    steps += [
+        ('recipe_favorites', Favorite.objects.filter(recipe__in=recipes)),
+        ('recipe_shopping_cart',
+         ShoppingList.objects.filter(recipe__in=recipes)),
+        ('recipes', recipes),
+    ]
+    if job.kind == DeletionJob.USER:
+        steps += [
+            ('changes', Change.objects.filter(user_id=user_id)),
+            ('user', User.objects.filter(id=user_id)),
+        ]
+    return steps
+
+
+def hide_user(user):
+    User.objects.filter(id=user.id).update(is_active=False)
+    recipes = Recipe.objects.filter(author=user)
+    images = list(recipes.exclude(image='').values_list('image', flat=True))
+    recipe_ids = list(recipes.values_list('id', flat=True))
+    recipes.update(deleted=True)
+    notify_recipe_changed(recipe_ids)
+    return images
+
+
+def hide_recipe(recipe):
+    Recipe.all_objects.filter(id=recipe.id).update(deleted=True)
+    notify_recipe_changed([recipe.id])
+    return [recipe.image.name] if recipe.image else []
+
+
+def schedule_deletion(instance):
+    with transaction.atomic():
+        if isinstance(instance, Recipe):
+            kind, images = DeletionJob.RECIPE, hide_recipe(instance)
+        else:
+            kind, images = DeletionJob.USER, hide_user(instance)
+        job = DeletionJob.objects.create(
+            kind=kind, object_id=instance.id, images=images
+        )
+        transaction.on_commit(lambda: submit(job.id))
+    return job
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='deletion'
+        )
+    return _executor
+
+
+def run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def submit(job_id):
+    if settings.DELETION_EXECUTOR == 'sync':
+        run_job(job_id)
+    elif settings.DELETION_EXECUTOR == 'local':
+        get_executor().submit(run_in_thread, job_id)
+
+
+def claim_job(job_id):
+    stale = timezone.now() - timedelta(seconds=STALE_SECONDS)
+    return DeletionJob.objects.filter(
+        Q(status=DeletionJob.PENDING)
+        | Q(status=DeletionJob.RUNNING, updated__lt=stale),
+        id=job_id
+    ).update(status=DeletionJob.RUNNING, updated=timezone.now())
+
+
+def delete_batch(job, step, queryset, batch_size):
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True)[
+        :batch_size
+    ])
+    if not ids:
+        return 0
+    with transaction.atomic():
+        queryset.model._base_manager.filter(pk__in=ids).delete()
+        job.progress[step] = job.progress.get(step, 0) + len(ids)
+        job.save(update_fields=('progress', 'updated'))
+    return len(ids)
+
+
+def delete_images(job):
+    field = Recipe._meta.get_field('image')
+    removed = 0
+    for name in set(job.images):
+        if Recipe.all_objects.filter(image=name).exists():
+            continue
+        if (field.storage.exists(name)
+                and field.storage.get_modified_time(name) <= job.created):
+            field.storage.delete(name)
+            removed += 1
+    return removed
+
+
+def run_job(job_id, batch_size=None, on_progress=None):
+    if not claim_job(job_id):
+        return None
+    job = DeletionJob.objects.get(id=job_id)
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    try:
+        steps = get_steps(job)
+        names = [name for name, _ in steps]
+        start = names.index(job.step) if job.step in names else 0
+        for name, queryset in steps[start:]:
+            if job.step != name:
+                job.step = name
+                job.save(update_fields=('step', 'updated'))
+            size = (min(RECIPE_BATCH_SIZE, batch_size) if name == 'recipes'
+                    else batch_size)
+            while delete_batch(job, name, queryset, size):
+                if on_progress:
+                    on_progress(job)
+        job.step = 'images'
+        job.progress['images'] = delete_images(job)
+        job.status = DeletionJob.DONE
+        job.save(update_fields=('step', 'progress', 'status', 'updated'))
+    except Exception:
+        logger.exception('Ошибка удаления %s %s', job.kind, job.object_id)
+        job.status = DeletionJob.FAILED
+        job.error = traceback.format_exc()
+        job.save(update_fields=('status', 'error', 'updated'))
+    if on_progress:
+        on_progress(job)
+    return job
+
+
+def get_pending_jobs():
+    stale = timezone.now() - timedelta(seconds=STALE_SECONDS)
+    return DeletionJob.objects.filter(
+        Q(status=DeletionJob.PENDING)
+        | Q(status=DeletionJob.RUNNING, updated__lt=stale)
+    ).order_by('id')
+
+
+def retry_failed_jobs():
+    return DeletionJob.objects.filter(status=DeletionJob.FAILED).update(
+        status=DeletionJob.PENDING, error=''
+    )
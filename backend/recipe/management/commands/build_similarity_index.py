@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from recipe.similarity import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает индекс похожих рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recipes, buckets = rebuild_index(options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Индекс построен: рецептов {recipes}, '
+            f'записей в корзинах {buckets}, время {elapsed:.2f} с.'
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from recipe.models import Recipe
+from recipe.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы изображений, на которые не ссылается ни один рецепт'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Не удалять файлы моложе N секунд')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def is_referenced(self, name):
+        return Recipe.all_objects.filter(image=name).exists()
+
+    def handle(self, *args, **options):
+        field = Recipe._meta.get_field('image')
+        referenced = set(Recipe.all_objects.exclude(image='').values_list(
+            'image', flat=True
+        ).iterator())
+        removed = collect_garbage(
+            field.storage, field.upload_to.rstrip('/'), referenced,
+            self.is_referenced, options['min_age'], options['dry_run']
+        )
+        for name in removed:
+            self.stdout.write(name)
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{action} файлов: {len(removed)}')
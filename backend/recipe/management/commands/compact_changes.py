@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from recipe.sync import compact_changes
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из журнала изменений записи, '
+            'перекрытые более поздними изменениями тех же объектов')
+
+    def handle(self, *args, **options):
+        count = compact_changes()
+        self.stdout.write(f'Удалено записей журнала: {count}')
@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from recipe.ndjson import CHUNK_SIZE, export_recipes
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в формате NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            self.write(sys.stdout, options['chunk_size'])
+            return
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            count = self.write(f, options['chunk_size'])
+        self.stdout.write(f'Выгружено рецептов: {count}')
+
+    def write(self, f, chunk_size):
+        count = 0
+        for line in export_recipes(chunk_size=chunk_size):
+            f.write(line)
+            count += 1
+        return count
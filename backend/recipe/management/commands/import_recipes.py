@@ -0,0 +1,39 @@
+import os
+
+from django.core.management.base import BaseCommand
+from recipe.ndjson import CHUNK_SIZE, RecipeImporter
+
+
+class Command(BaseCommand):
+    help = 'Загружает рецепты из файла NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с последней сохранённой строки'
+        )
+
+    def handle(self, *args, **options):
+        progress_path = options['path'] + '.progress'
+        start = 0
+        if options['resume'] and os.path.exists(progress_path):
+            with open(progress_path) as f:
+                start = int(f.read() or 0)
+            self.stdout.write(f'Продолжение со строки {start + 1}')
+
+        def save_progress(position):
+            with open(progress_path, 'w') as f:
+                f.write(str(position))
+
+        importer = RecipeImporter(options['batch_size'])
+        with open(options['path'], encoding='utf-8') as f:
+            importer.run(f, start, save_progress)
+        for error in importer.errors:
+            self.stderr.write(error)
+        os.remove(progress_path)
+        self.stdout.write(
+            f'Загружено рецептов: {importer.created}, '
+            f'пропущено: {importer.skipped}, ошибок: {len(importer.errors)}'
+        )
@@ -1,5 +1,6 @@
 import csv
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from recipe.models import Ingredient
 
@@ -9,14 +10,22 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.import_ingredients()
         print('Загрузка ингредиентов завершена.')
+        call_command('publish_catalogs')
 
     def import_ingredients(self, file='ingredients.csv'):
         print(f'Загрузка {file}...')
         file_path = f'./data/{file}'
+        existing = set(Ingredient.objects.values_list(
+            'name', 'measurement_unit'
+        ))
+        ingredients = []
         with open(file_path, newline='', encoding='utf-8') as f:
             reader = csv.reader(f)
-            for row in reader:
-                status, created = Ingredient.objects.update_or_create(
-                    name=row[0],
-                    measurement_unit=row[1]
-                )
+            for name, measurement_unit in reader:
+                if (name, measurement_unit) in existing:
+                    continue
+                existing.add((name, measurement_unit))
+                ingredients.append(Ingredient(
+                    name=name, measurement_unit=measurement_unit
+                ))
+        Ingredient.objects.bulk_create(ingredients, batch_size=1000)
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recipe.deletion import get_pending_jobs, retry_failed_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = ('Выполняет отложенное удаление пользователей и рецептов, '
+            'в том числе продолжает прерванные задачи')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.DELETION_BATCH_SIZE)
+        parser.add_argument('--retry-failed', action='store_true')
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(f'Повторно запущено задач: '
+                              f'{retry_failed_jobs()}')
+        while True:
+            for job in get_pending_jobs():
+                run_job(job.id, options['batch_size'], self.report)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def report(self, job):
+        progress = ', '.join(
+            f'{step}: {count}' for step, count in job.progress.items()
+        )
+        self.stdout.write(
+            f'{job.get_kind_display()} {job.object_id} '
+            f'[{job.get_status_display()}] {job.step} — {progress}'
+        )
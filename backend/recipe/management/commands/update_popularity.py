@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from recipe.popularity import update_rankings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги популярных рецептов'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = update_rankings()
+        self.stdout.write(
+            f'Рейтинг обновлён: рецептов {count}, '
+            f'время {time.perf_counter() - started:.2f} с.'
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 3.2 on 2026-10-19 10:09
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+SOURCES = (
+    ('recipe', 'recipe', 'Recipe', 'id'),
+    ('favorite', 'recipe', 'Favorite', 'recipe_id'),
+    ('shopping_cart', 'recipe', 'ShoppingList', 'recipe_id'),
+    ('follow', 'users', 'Follow', 'following_id'),
+)
+
+
+def seed_changes(apps, schema_editor):
+    Change = apps.get_model('recipe', 'Change')
+    for kind, app_label, model_name, field in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        user_field = 'user_id' if kind != 'recipe' else 'pk'
+        rows = model.objects.order_by('id').values_list(
+            field, user_field
+        ).iterator(chunk_size=500)
+        while True:
+            chunk = [
+                Change(kind=kind, object_id=object_id,
+                       user_id=user_id if kind != 'recipe' else None)
+                for object_id, user_id in islice(rows, 500)
+            ]
+            if not chunk:
+                break
+            Change.objects.bulk_create(chunk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipe', '0005_favorite_created_popularity'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('recipe', 'Рецепт'), ('favorite', 'Избранное'), ('shopping_cart', 'Список покупок'), ('follow', 'Подписка')], max_length=16)),
+                ('object_id', models.PositiveIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['user', 'id'], name='change_user_idx'),
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
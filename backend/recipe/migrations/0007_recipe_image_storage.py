@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-19 10:10
+
+import recipe.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_change_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(blank=True, storage=recipe.storage.ContentAddressedStorage(), upload_to='recipe/'),
+        ),
+    ]
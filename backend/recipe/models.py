@@ -2,6 +2,7 @@ from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
 from django.db import models
 from django.db.models import Sum
+from recipe.storage import ContentAddressedStorage
 from users.models import User
 
 
@@ -31,6 +32,11 @@ class Tag(models.Model):
     )
 
 
+class RecipeManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted=False)
+
+
 class Recipe (models.Model):
 
     name = models.CharField(max_length=256, unique=True)
@@ -41,6 +47,7 @@ class Recipe (models.Model):
     )
     image = models.ImageField(
         upload_to='recipe/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
     author = models.ForeignKey(
@@ -61,6 +68,17 @@ class Recipe (models.Model):
             )
         ]
     )
+    deleted = models.BooleanField(default=False)
+
+    objects = RecipeManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ('-id',)
+        indexes = [
+            models.Index(fields=('cooking_time', 'id'),
+                         name='recipe_cooking_time_idx'),
+        ]
 
 
 class IngredientRecipe(models.Model):
@@ -82,10 +100,16 @@ class IngredientRecipe(models.Model):
         ]
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=('ingredient', 'recipe'),
+                         name='ingredientrecipe_lookup_idx'),
+        ]
+
     @classmethod
     def get(cls, user):
         ingredients = cls.objects.filter(
-            recipe__shoppings__user=user
+            recipe__shoppings__user=user, recipe__deleted=False
         ).values(
             'ingredient__name', 'ingredient__measurement_unit'
         ).annotate(ingredient_amount=Sum('amount'))
@@ -107,6 +131,15 @@ class Favorite(models.Model):
         Recipe, on_delete=models.CASCADE,
         related_name='favorites'
     )
+    created = models.DateTimeField(auto_now_add=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('user', 'recipe'),
+                         name='favorite_user_recipe_idx'),
+            models.Index(fields=('created', 'recipe'),
+                         name='favorite_created_idx'),
+        ]
 
 
 class ShoppingList (models.Model):
@@ -120,3 +153,126 @@ class ShoppingList (models.Model):
         on_delete=models.CASCADE,
         related_name='shoppings'
     )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('user', 'recipe'),
+                         name='shoppinglist_user_recipe_idx'),
+        ]
+
+
+class RecipeSignature(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature'
+    )
+    ingredients = models.JSONField(default=list)
+    tags = models.JSONField(default=list)
+    buckets = models.JSONField(default=list)
+
+
+class RecipeBucket(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='buckets'
+    )
+    key = models.BigIntegerField(db_index=True)
+
+
+class RecipeDocument(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='document'
+    )
+    data = models.JSONField()
+    updated = models.DateTimeField(auto_now=True)
+
+
+class RecipePopularity(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity'
+    )
+    popular = models.FloatField(default=0)
+    trending = models.FloatField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('-popular', '-recipe'),
+                         name='recipe_popular_idx'),
+            models.Index(fields=('-trending', '-recipe'),
+                         name='recipe_trending_idx'),
+        ]
+
+
+class Change(models.Model):
+    RECIPE = 'recipe'
+    FAVORITE = 'favorite'
+    SHOPPING_CART = 'shopping_cart'
+    FOLLOW = 'follow'
+    KINDS = (
+        (RECIPE, 'Рецепт'),
+        (FAVORITE, 'Избранное'),
+        (SHOPPING_CART, 'Список покупок'),
+        (FOLLOW, 'Подписка'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='changes'
+    )
+    deleted = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('user', 'id'), name='change_user_idx'),
+        ]
+
+
+class DeletionJob(models.Model):
+    USER = 'user'
+    RECIPE = 'recipe'
+    KINDS = (
+        (USER, 'Пользователь'),
+        (RECIPE, 'Рецепт'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    kind = models.CharField(max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUSES,
+                              default=PENDING)
+    step = models.CharField(max_length=32, blank=True)
+    progress = models.JSONField(default=dict)
+    images = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('status', 'updated'),
+                         name='deletionjob_status_idx'),
+        ]
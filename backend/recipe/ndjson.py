@@ -0,0 +1,241 @@
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from recipe.models import Ingredient, IngredientRecipe, Recipe, Tag
+from recipe.signals import ingredients_imported, notify_recipe_changed
+from users.models import User
+
+CHUNK_SIZE = 500
+REQUIRED_FIELDS = ('name', 'text', 'cooking_time', 'author')
+MAX_COOKING_TIME = 1440
+MAX_AMOUNT = 3000
+
+
+def _export_chunk(recipes):
+    recipe_ids = [recipe['id'] for recipe in recipes]
+    tags = defaultdict(list)
+    ingredients = defaultdict(list)
+    for recipe_id, slug in Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids
+    ).values_list('recipe_id', 'tag__slug'):
+        tags[recipe_id].append(slug)
+    for row in IngredientRecipe.objects.filter(
+            recipe_id__in=recipe_ids
+    ).values('recipe_id', 'ingredient__name',
+             'ingredient__measurement_unit', 'amount'):
+        ingredients[row['recipe_id']].append({
+            'name': row['ingredient__name'],
+            'measurement_unit': row['ingredient__measurement_unit'],
+            'amount': row['amount'],
+        })
+    for recipe in recipes:
+        yield json.dumps({
+            'name': recipe['name'],
+            'text': recipe['text'],
+            'cooking_time': recipe['cooking_time'],
+            'image': recipe['image'],
+            'author': recipe['author__email'],
+            'tags': tags[recipe['id']],
+            'ingredients': ingredients[recipe['id']],
+        }, ensure_ascii=False) + '\n'
+
+
+def export_recipes(queryset=None, chunk_size=CHUNK_SIZE):
+    if queryset is None:
+        queryset = Recipe.objects.all()
+    rows = queryset.order_by('id').values(
+        'id', 'name', 'text', 'cooking_time', 'image', 'author__email'
+    ).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from _export_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _export_chunk(chunk)
+
+
+def is_number(value, low, high):
+    return (isinstance(value, int) and not isinstance(value, bool)
+            and low <= value <= high)
+
+
+def is_text(value, max_length=None):
+    return isinstance(value, str) and bool(value) and (
+        max_length is None or len(value) <= max_length
+    )
+
+
+def validate_ingredient(item):
+    if not isinstance(item, dict):
+        return 'ингредиент должен быть объектом'
+    if not is_text(item.get('name'), 200):
+        return 'у ингредиента нет названия'
+    if not is_text(item.get('measurement_unit'), 200):
+        return f'у ингредиента {item["name"]} нет единицы измерения'
+    if not is_number(item.get('amount'), 1, MAX_AMOUNT):
+        return (f'количество ингредиента {item["name"]} должно быть '
+                f'от 1 до {MAX_AMOUNT}')
+    return None
+
+
+def validate_record(record):
+    if not isinstance(record, dict):
+        return 'запись должна быть объектом'
+    missing = [key for key in REQUIRED_FIELDS if key not in record]
+    if missing:
+        return f'нет обязательных полей {", ".join(missing)}'
+    if not is_text(record['name'], 256):
+        return 'некорректное название'
+    if not is_text(record['text']) or not is_text(record['author']):
+        return 'некорректное описание или автор'
+    if not is_number(record['cooking_time'], 1, MAX_COOKING_TIME):
+        return (f'время приготовления должно быть от 1 до '
+                f'{MAX_COOKING_TIME}')
+    tags = record.get('tags', [])
+    if not isinstance(tags, list) or not all(map(is_text, tags)):
+        return 'теги должны быть списком слагов'
+    ingredients = record.get('ingredients', [])
+    if not isinstance(ingredients, list):
+        return 'ингредиенты должны быть списком'
+    for item in ingredients:
+        error = validate_ingredient(item)
+        if error:
+            return error
+    return None
+
+
+class RecipeImporter:
+    def __init__(self, batch_size=CHUNK_SIZE):
+        self.batch_size = batch_size
+        self.authors = {}
+        self.tags = {}
+        self.ingredients = {}
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+        self.new_ingredients = 0
+
+    def run(self, lines, start=0, on_batch=None):
+        batch = []
+        position = start
+        for number, line in enumerate(lines, 1):
+            if number <= start:
+                continue
+            position = number
+            if line.strip():
+                batch.append((number, line))
+            if len(batch) == self.batch_size:
+                self.import_batch(batch)
+                batch = []
+                if on_batch:
+                    on_batch(position)
+        if batch:
+            self.import_batch(batch)
+        if on_batch:
+            on_batch(position)
+        if self.new_ingredients:
+            ingredients_imported.send(sender=Ingredient)
+
+    def resolve_authors(self, emails):
+        missing = set(emails) - set(self.authors)
+        self.authors.update(User.objects.filter(
+            email__in=missing
+        ).values_list('email', 'id'))
+        return self.authors
+
+    def resolve_tags(self, slugs):
+        missing = set(slugs) - set(self.tags)
+        self.tags.update(Tag.objects.filter(
+            slug__in=missing
+        ).values_list('slug', 'id'))
+        return self.tags
+
+    def load_ingredients(self, keys):
+        for pk, name, unit in Ingredient.objects.filter(
+                name__in={name for name, _ in keys}
+        ).values_list('id', 'name', 'measurement_unit'):
+            self.ingredients.setdefault((name, unit), pk)
+
+    def resolve_ingredients(self, keys):
+        missing = set(keys) - set(self.ingredients)
+        self.load_ingredients(missing)
+        missing -= set(self.ingredients)
+        if missing:
+            Ingredient.objects.bulk_create([
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in missing
+            ], self.batch_size)
+            self.new_ingredients += len(missing)
+            self.load_ingredients(missing)
+        return self.ingredients
+
+    def import_batch(self, batch):
+        records = []
+        for number, line in batch:
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                self.errors.append(f'Строка {number}: {error}')
+                continue
+            error = validate_record(record)
+            if error:
+                self.errors.append(f'Строка {number}: {error}')
+                continue
+            records.append((number, record))
+        existing = set(Recipe.all_objects.filter(
+            name__in=[record['name'] for _, record in records]
+        ).values_list('name', flat=True))
+        authors = self.resolve_authors(
+            record['author'] for _, record in records
+        )
+        tags = self.resolve_tags(
+            slug for _, record in records for slug in record.get('tags', ())
+        )
+        ingredients = self.resolve_ingredients(
+            (item['name'], item['measurement_unit'])
+            for _, record in records
+            for item in record.get('ingredients', ())
+        )
+        recipes = {}
+        for number, record in records:
+            if record['name'] in existing or record['name'] in recipes:
+                self.skipped += 1
+                continue
+            if record['author'] not in authors:
+                self.errors.append(
+                    f'Строка {number}: автор {record["author"]} не найден'
+                )
+                continue
+            recipes[record['name']] = record
+        with transaction.atomic():
+            Recipe.objects.bulk_create([
+                Recipe(name=name, text=record['text'],
+                       cooking_time=record['cooking_time'],
+                       image=record.get('image') or '',
+                       author_id=authors[record['author']])
+                for name, record in recipes.items()
+            ], self.batch_size)
+            ids = dict(Recipe.objects.filter(
+                name__in=recipes
+            ).values_list('name', 'id'))
+            Recipe.tags.through.objects.bulk_create([
+                Recipe.tags.through(recipe_id=ids[name], tag_id=tags[slug])
+                for name, record in recipes.items()
+                for slug in set(record.get('tags', ())) if slug in tags
+            ], self.batch_size)
+            IngredientRecipe.objects.bulk_create([
+                IngredientRecipe(
+                    recipe_id=ids[name],
+                    ingredient_id=ingredients[
+                        (item['name'], item['measurement_unit'])
+                    ],
+                    amount=item['amount']
+                )
+                for name, record in recipes.items()
+                for item in record.get('ingredients', ())
+            ], self.batch_size)
+            notify_recipe_changed(ids.values())
+        self.created += len(recipes)
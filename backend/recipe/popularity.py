@@ -0,0 +1,45 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from recipe.models import Favorite, RecipePopularity
+
+# Период полураспада и окно учёта добавлений в избранное
+RANKINGS = {
+    'popular': (timedelta(days=30), timedelta(days=180)),
+    'trending': (timedelta(days=2), timedelta(days=7)),
+}
+
+
+def compute_scores(now=None):
+    now = now or timezone.now()
+    since = now - max(window for _, window in RANKINGS.values())
+    scores = defaultdict(lambda: dict.fromkeys(RANKINGS, 0.0))
+    rows = Favorite.objects.filter(
+        created__isnull=False, created__gte=since
+    ).annotate(
+        hour=TruncHour('created')
+    ).order_by().values('recipe_id', 'hour').annotate(count=Count('id'))
+    for row in rows.iterator():
+        age = now - row['hour']
+        for name, (half_life, window) in RANKINGS.items():
+            if age <= window:
+                scores[row['recipe_id']][name] += (
+                    row['count'] * 0.5 ** (age / half_life)
+                )
+    return scores
+
+
+def update_rankings(now=None, batch_size=1000):
+    scores = compute_scores(now)
+    with transaction.atomic():
+        RecipePopularity.objects.all().delete()
+        RecipePopularity.objects.bulk_create(
+            (RecipePopularity(recipe_id=recipe_id, **recipe_scores)
+             for recipe_id, recipe_scores in scores.items()),
+            batch_size
+        )
+    return len(scores)
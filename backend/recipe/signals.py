@@ -0,0 +1,84 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+from recipe.models import (Change, Favorite, IngredientRecipe, Recipe,
+                           ShoppingList, Tag)
+from recipe.similarity import update_index
+from recipe.sync import record_changes, schedule_change
+from recipe.transactions import on_commit_batch
+from users.models import Follow
+
+recipe_changed = Signal()
+ingredients_imported = Signal()
+COLLECTIONS = {
+    Favorite: (Change.FAVORITE, 'recipe_id'),
+    ShoppingList: (Change.SHOPPING_CART, 'recipe_id'),
+    Follow: (Change.FOLLOW, 'following_id'),
+}
+
+
+def send_recipe_changed(recipe_ids):
+    recipe_changed.send(sender=Recipe, recipe_ids=recipe_ids)
+
+
+def notify_recipe_changed(recipe_ids):
+    on_commit_batch('recipe_changed', send_recipe_changed, recipe_ids)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    notify_recipe_changed([instance.id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        notify_recipe_changed([instance.id])
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    notify_recipe_changed(list(Recipe.objects.filter(
+        tags=instance
+    ).values_list('id', flat=True)))
+
+
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    notify_recipe_changed([instance.recipe_id])
+
+
+@receiver(recipe_changed)
+def update_similarity_index(sender, recipe_ids, **kwargs):
+    update_index(recipe_ids)
+
+
+@receiver(recipe_changed)
+def record_recipe_changes(sender, recipe_ids, **kwargs):
+    recipe_ids = set(recipe_ids)
+    existing = set(Recipe.objects.filter(
+        id__in=recipe_ids
+    ).values_list('id', flat=True))
+    record_changes(Change.RECIPE, sorted(existing))
+    record_changes(Change.RECIPE, sorted(recipe_ids - existing),
+                   deleted=True)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_save, sender=Follow)
+def collection_saved(sender, instance, created, **kwargs):
+    if created:
+        kind, field = COLLECTIONS[sender]
+        schedule_change(kind, getattr(instance, field), instance.user_id)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingList)
+@receiver(post_delete, sender=Follow)
+def collection_deleted(sender, instance, **kwargs):
+    kind, field = COLLECTIONS[sender]
+    schedule_change(kind, getattr(instance, field), instance.user_id,
+                    deleted=True)
@@ -0,0 +1,137 @@
+import hashlib
+import random
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from recipe.models import (IngredientRecipe, Recipe, RecipeBucket,
+                           RecipeSignature)
+
+SIGNATURE_SIZE = 64
+BAND_ROWS = 4
+MAX_PRIME = (1 << 61) - 1
+MAX_RANKED = 200
+
+_random = random.Random(SIGNATURE_SIZE)
+PERMUTATIONS = [
+    (_random.randrange(1, MAX_PRIME), _random.randrange(0, MAX_PRIME))
+    for _ in range(SIGNATURE_SIZE)
+]
+
+
+def _hash(value):
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') & ((1 << 63) - 1)
+
+
+def get_features(ingredients, tags):
+    return ([f'i{pk}' for pk in ingredients]
+            + [f't{pk}' for pk in tags])
+
+
+def get_bucket_keys(features):
+    if not features:
+        return []
+    hashes = [_hash(feature) for feature in features]
+    signature = [
+        min((a * value + b) % MAX_PRIME for value in hashes)
+        for a, b in PERMUTATIONS
+    ]
+    return [
+        _hash(f'{band}:' + ':'.join(
+            str(value) for value in signature[band:band + BAND_ROWS]
+        ))
+        for band in range(0, SIGNATURE_SIZE, BAND_ROWS)
+    ]
+
+
+def build_signatures(recipe_ids, ingredients, tags):
+    signatures = []
+    buckets = []
+    for recipe_id in recipe_ids:
+        recipe_ingredients = sorted(ingredients.get(recipe_id, ()))
+        recipe_tags = sorted(tags.get(recipe_id, ()))
+        keys = get_bucket_keys(get_features(recipe_ingredients, recipe_tags))
+        signatures.append(RecipeSignature(
+            recipe_id=recipe_id, ingredients=recipe_ingredients,
+            tags=recipe_tags, buckets=keys
+        ))
+        buckets.extend(
+            RecipeBucket(recipe_id=recipe_id, key=key) for key in set(keys)
+        )
+    return signatures, buckets
+
+
+def load_features(recipe_ids=None):
+    ingredients = defaultdict(set)
+    tags = defaultdict(set)
+    ingredient_rows = IngredientRecipe.objects.all()
+    tag_rows = Recipe.tags.through.objects.all()
+    if recipe_ids is not None:
+        ingredient_rows = ingredient_rows.filter(recipe_id__in=recipe_ids)
+        tag_rows = tag_rows.filter(recipe_id__in=recipe_ids)
+    for recipe_id, ingredient_id in ingredient_rows.values_list(
+            'recipe_id', 'ingredient_id').iterator():
+        ingredients[recipe_id].add(ingredient_id)
+    for recipe_id, tag_id in tag_rows.values_list(
+            'recipe_id', 'tag_id').iterator():
+        tags[recipe_id].add(tag_id)
+    return ingredients, tags
+
+
+def update_index(recipe_ids):
+    with transaction.atomic():
+        RecipeSignature.objects.filter(recipe_id__in=recipe_ids).delete()
+        RecipeBucket.objects.filter(recipe_id__in=recipe_ids).delete()
+        recipe_ids = list(Recipe.objects.filter(
+            id__in=recipe_ids
+        ).values_list('id', flat=True))
+        if not recipe_ids:
+            return
+        signatures, buckets = build_signatures(
+            recipe_ids, *load_features(recipe_ids)
+        )
+        RecipeSignature.objects.bulk_create(signatures)
+        RecipeBucket.objects.bulk_create(buckets)
+
+
+def rebuild_index(batch_size=1000):
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    ingredients, tags = load_features()
+    with transaction.atomic():
+        RecipeBucket.objects.all().delete()
+        RecipeSignature.objects.all().delete()
+        for start in range(0, len(recipe_ids), batch_size):
+            signatures, buckets = build_signatures(
+                recipe_ids[start:start + batch_size], ingredients, tags
+            )
+            RecipeSignature.objects.bulk_create(signatures, batch_size)
+            RecipeBucket.objects.bulk_create(buckets, batch_size)
+    return len(recipe_ids), RecipeBucket.objects.count()
+
+
+def get_similar_recipes(recipe, limit):
+    signature = RecipeSignature.objects.filter(recipe=recipe).first()
+    if signature is None or not signature.buckets:
+        return []
+    candidates = list(RecipeBucket.objects.filter(
+        key__in=signature.buckets
+    ).exclude(recipe=recipe).values('recipe_id').annotate(
+        hits=Count('id')
+    ).order_by('-hits', 'recipe_id').values_list(
+        'recipe_id', flat=True
+    )[:MAX_RANKED])
+    ingredients = set(signature.ingredients)
+    tags = set(signature.tags)
+    scores = {}
+    for candidate in RecipeSignature.objects.filter(recipe_id__in=candidates):
+        shared = (len(ingredients.intersection(candidate.ingredients))
+                  + len(tags.intersection(candidate.tags)))
+        total = (len(ingredients.union(candidate.ingredients))
+                 + len(tags.union(candidate.tags)))
+        if shared:
+            scores[candidate.recipe_id] = (shared, shared / total)
+    ranked = sorted(scores, key=lambda pk: (scores[pk], -pk),
+                    reverse=True)[:limit]
+    recipes = Recipe.objects.in_bulk(ranked)
+    return [recipes[pk] for pk in ranked if pk in recipes]
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import posixpath
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(posixpath.dirname(name), digest[:2],
+                              digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+
+def walk_files(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk_files(storage, posixpath.join(path, directory))
+
+
+def collect_garbage(storage, path, referenced, is_referenced, min_age,
+                    dry_run=False):
+    threshold = timezone.now() - timedelta(seconds=min_age)
+    removed = []
+    if not storage.exists(path):
+        return removed
+    for name in walk_files(storage, path):
+        if name in referenced or storage.get_modified_time(name) > threshold:
+            continue
+        if not dry_run:
+            if (is_referenced(name)
+                    or storage.get_modified_time(name) > threshold):
+                continue
+            storage.delete(name)
+        removed.append(name)
+    return removed
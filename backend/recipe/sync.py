@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from recipe.models import Change
+from users.models import User
+
+SYNC_LIMIT = 500
+
+
+def record_changes(kind, object_ids, user_id=None, deleted=False):
+    if (user_id is not None
+            and not User.objects.filter(id=user_id).exists()):
+        return
+    Change.objects.bulk_create([
+        Change(kind=kind, object_id=object_id, user_id=user_id,
+               deleted=deleted)
+        for object_id in object_ids
+    ], SYNC_LIMIT)
+
+
+def schedule_change(kind, object_id, user_id=None, deleted=False):
+    transaction.on_commit(lambda: record_changes(
+        kind, [object_id], user_id, deleted
+    ))
+
+
+def get_changes(user, cursor=0, limit=SYNC_LIMIT):
+    owners = Q(user__isnull=True)
+    if user.is_authenticated:
+        owners |= Q(user=user)
+    entries = list(Change.objects.filter(
+        owners, id__gt=cursor
+    ).order_by('id')[:limit + 1])
+    has_more = len(entries) > limit
+    settled = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    for position, entry in enumerate(entries[:limit]):
+        if entry.created > settled:
+            return entries[:position], True
+    return entries[:limit], has_more
+
+
+def collapse(entries):
+    states = {kind: {} for kind, _ in Change.KINDS}
+    for entry in entries:
+        states[entry.kind][entry.object_id] = not entry.deleted
+    return {
+        kind: (sorted(pk for pk, alive in objects.items() if alive),
+               sorted(pk for pk, alive in objects.items() if not alive))
+        for kind, objects in states.items()
+    }
+
+
+def compact_changes():
+    latest = Change.objects.values(
+        'kind', 'object_id', 'user'
+    ).annotate(last=Max('id')).values('last')
+    return Change.objects.exclude(id__in=latest).delete()[0]
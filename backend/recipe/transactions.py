@@ -0,0 +1,35 @@
+from threading import local
+from weakref import WeakValueDictionary
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+_state = local()
+
+
+class PendingBatch(set):
+    def __init__(self, key, callback):
+        super().__init__()
+        self.key = key
+        self.callback = callback
+
+    def __call__(self):
+        get_pending().pop(self.key, None)
+        self.callback(sorted(self))
+
+
+def get_pending():
+    if not hasattr(_state, 'batches'):
+        _state.batches = WeakValueDictionary()
+    return _state.batches
+
+
+def on_commit_batch(name, callback, items=(), using=None):
+    key = (using or DEFAULT_DB_ALIAS, name)
+    pending = get_pending()
+    batch = pending.get(key)
+    if batch is not None:
+        batch.update(items)
+        return
+    batch = pending[key] = PendingBatch(key, callback)
+    batch.update(items)
+    transaction.on_commit(batch, using)